@@ -1,4 +1,37 @@
 import pandas as pd
+import xlsxwriter
+
+def write_excel_streaming(df, output_file, sheet_name):
+    """
+    Write a DataFrame to a new Excel file one row at a time, using
+    xlsxwriter's constant_memory mode so each row is flushed to disk
+    as soon as the next one starts.
+
+    DataFrame.to_excel can't be used with constant_memory: it writes
+    cells column by column, and constant_memory silently drops any cell
+    written to a row that has already been flushed: only the header,
+    the first column and the last row would come out whole.
+
+    Args:
+        df (pd.DataFrame): The data to write; the header row is taken from its columns
+        output_file (str): The path of the Excel file to create
+        sheet_name (str): The name of the worksheet
+    :param df:
+    :param output_file:
+    :param sheet_name:
+    :return:
+    """
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True,
+                                                 'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        worksheet.write_row(0, 0, df.columns, header_format)
+        for row_num, row in enumerate(df.itertuples(index=False, name=None), 1):
+            # Blank cells for missing values (NaN/NaT), same as to_excel
+            worksheet.write_row(row_num, 0, [None if pd.isna(value) else value for value in row])
+    finally:
+        workbook.close()
 
 def perform_xlookup_equivalent(file_path):
     """
@@ -14,46 +47,43 @@ def perform_xlookup_equivalent(file_path):
     """
 
     try:
-        # 1. Read the two required sheets into separate DataFrames
-        df_target = pd.read_excel(file_path, sheet_name='IBUSRQDC1__sm')
-        df_source = pd.read_excel(file_path, sheet_name='Sheet1')
+        # 1. Open the workbook once and read the two required sheets into separate DataFrames
+        # 2. Only the columns needed from the source sheet (sheet1) are read:
+        # the match column (B) and the data columns (D,E)
+        with pd.ExcelFile(file_path) as xl:
+            df_target = xl.parse('IBUSRQDC1__sm')
+            df_source_lookup = xl.parse('Sheet1', usecols=['B','D','E'])
 
-        # 2. Select the columns needed from the source sheet (sheet1)
-        # We need the match column (B) and the data columns (D,E)
-        df_source_lookup =   df_source[['B','D','E']]
-
-        # Rename columns to their descriptive names or final names for clarity before merge
+        # Rename columns to their descriptive names for clarity before the lookup
         # Assuming the column names are just B, D, E in Sheet1 and I in IBUSRQDC1__sm
-        df_target.rename(columns={'I': 'Match_Key'}, inplace=True)
-        df_source_lookup.rename(columns={'B': 'Match_Key',
-                                          'D': 'New_Col_C_Data',
-                                          'E': 'New_col_B_Data'}, inplace=True)
+        df_source_lookup = df_source_lookup.rename(columns={'B': 'Match_Key',
+                                                            'D': 'New_Col_C_Data',
+                                                            'E': 'New_col_B_Data'})
 
-        # 3. Perform the 'XLOOKUP' equivalent using a left merge
-        # 'left' merge ensures all rows from the target sheet are kept (like XLOOUP)
-        # We join on 'Match_key' (Sheet1B:B and ISUSRQDC1__sm!I:I)
-        df_final = pd.merge(
-            df_target,
-            df_source_lookup,
-            on='Match_Key',
-            how='left'
-        )
+        # XLOOKUP returns the first match, so keep only the first row per key
+        # and index the lookup table by it.
+        # Neither sheet needs to be sorted: the map below is a single pass over the
+        # target keys against a hash of the lookup keys. Don't switch this to a sorted
+        # merge (e.g. pd.merge_ordered): that only pays off on pre-sorted keys and it
+        # returns the rows in key order, not in the target sheet's order.
+        lookup = df_source_lookup.drop_duplicates('Match_Key', keep='first').set_index('Match_Key')
 
-        # 4. Prepare the final DataFrame for output
-        # Rename the columns to their target names (B and C)
+        # 3. Perform the 'XLOOKUP' equivalent by mapping each key through the lookup table
+        # Mapping keeps every row of the target sheet, in order (like XLOOKUP), and
+        # writes the new columns straight onto it instead of building a merged copy.
+        # We match on Sheet1!B:B and IBUSRQDC1__sm!I:I
         # Note: DataFrames column names are not restricted to A, B, C... like Excel
-        df_final.rename(columns={'New_Col_B_Data': 'B (from E)',
-                                 'New_Col_C_Data': 'C (from D)',
-                                 'Match_Key': 'I'}, inplace=True)
-
         # Handle 'Not Found' equivalent: pandas uses NaN for non-matches.
-        # We can fill NaNs in the new columns with a string like "Not Found"
-        df_final['B (from E)'].fillna('Not Found',inplace=True)
-        df_final['C (from D)'].fillna('Not Found',inplace=True)
+        # We fill NaNs in the new columns with a string like "Not Found"
+        # The filled columns repeat a handful of values, so they are stored as categories
+        df_target = df_target.assign(**{
+            'C (from D)': df_target['I'].map(lookup['New_Col_C_Data']).fillna('Not Found').astype('category'),
+            'B (from E)': df_target['I'].map(lookup['New_col_B_Data']).fillna('Not Found').astype('category'),
+        })
 
-        # 5. Write the result to a new Excel file
+        # 4. Write the result to a new Excel file, streaming it row by row
         output_file = 'Result_IBUSRQDC1_sm_with_lookups.xlsx'
-        df_final.to_excel(output_file,sheet_name='IBUSRQDC1__sm_Result', index=False)
+        write_excel_streaming(df_target, output_file, 'IBUSRQDC1__sm_Result')
 
         print(f"✅ Success! Data has been merged and saved to: {output_file}")
 
@@ -1,31 +1,346 @@
 import csv
 import json
-import re
-from datetime import datetime
+import os
+import time
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
-def validate_email(email):
-    """
-    Validates the format of an email address.
-    :param email:
-    :return:
-    """
-    regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return re.match(regex,email)
+# Email format, checked with Arrow's (RE2) regex kernel over the whole column
+_EMAIL_PATTERN = r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+'
+
+# Samoa country code, with or without the leading '+'.
+# Kept as a pattern string: Arrow's regex kernels don't accept compiled patterns.
+_COUNTRY_CODE_PATTERN = r'\A\+?685'
+# First digits of Samoa non-mobile numbers, and of mobile numbers (checked in that order)
+_NON_MOBILE_PREFIXES = frozenset('23456')
+_MOBILE_PREFIXES = frozenset('93')
+
+# DOB formats as strptime reads '%d/%m/%Y' and '%d/%m/%y' (tried in that order)
+# as (pattern, whether the year has 2 digits) pairs
+_DOB_PATTERNS = (
+    (r'^(?P<day>3[01]|[12][0-9]|0?[1-9])/(?P<month>1[0-2]|0?[1-9])/(?P<year>[0-9]{4})$', False),
+    (r'^(?P<day>3[01]|[12][0-9]|0?[1-9])/(?P<month>1[0-2]|0?[1-9])/(?P<year>[0-9]{2})$', True),
+)
+_30_DAY_MONTHS = (4, 6, 9, 11)
+
+# Bytes of CSV read and validated at a time; bounds memory use on large inputs
+_READ_BLOCK_SIZE = 1 << 22
+# Output files use a 1 MiB buffer so many rows/log lines share one write()
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+# Last formatted log timestamp, as [epoch second, text]
+_log_timestamp = [None, '']
 
 def log_message(log_file, message):
     """
     Write a message to the job log file.
+    The timestamp only has second resolution, so it is formatted once per second.
     :param log_file:
     :param message:
     :return:
     """
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_file.write(f"[{timestamp}] {message}\n")
+    second = int(time.time())
+    if second != _log_timestamp[0]:
+        _log_timestamp[:] = [second, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))]
+    log_file.write(f"[{_log_timestamp[1]}] {message}\n")
+
+def is_ascii_digits(values):
+    """
+    Check, for a whole column at once, which values are made only of the ASCII digits 0-9.
+    str.isdigit alone also accepts other Unicode digits (e.g. '١').
+    The match runs as an Arrow regex kernel over the column's contiguous string buffer.
+    :param values:
+    :return: a boolean mask
+    """
+    return values.str.fullmatch(r'[0-9]+')
+
+def parse_dates(values):
+    """
+    Parse DD/MM/YYYY (or else DD/MM/YY) dates for a whole column at once, formatted back as DD/MM/YYYY.
+    The fields are matched with an Arrow regex kernel and the calendar is checked with integer
+    column ops, so every year from 1 to 9999 parses whatever the pandas version
+    (pd.to_datetime only holds 1677-2262 before pandas 3).
+    :param values:
+    :return: the formatted dates, <NA> where a value isn't a valid date
+    """
+    text_type = pd.ArrowDtype(pa.string())
+    dates = pd.Series(pd.NA, index=values.index, dtype=text_type)
+    for pattern, two_digit_year in _DOB_PATTERNS:
+        parts = values.str.extract(pattern)
+        # Plain integers for the calendar checks (unmatched values read as 0 and fail them)
+        day, month, year = (parts[name].fillna('0').astype(np.int64).to_numpy()
+                            for name in ('day', 'month', 'year'))
+        if two_digit_year:
+            # Like strptime, 2-digit years 69-99 are 1969-1999 and 00-68 are 2000-2068
+            year = np.where(parts['year'].isna(), 0, year + np.where(year < 69, 2000, 1900))
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        valid = ((year >= 1)
+                 & ~((day == 31) & np.isin(month, _30_DAY_MONTHS))
+                 & ~((month == 2) & ((day > 29) | ((day == 29) & ~leap))))
+        formatted = (parts['day'].str.pad(2, fillchar='0') + '/' + parts['month'].str.pad(2, fillchar='0')
+                     + '/' + pd.Series(year, index=values.index).astype(text_type).str.pad(4, fillchar='0'))
+        dates = dates.fillna(formatted.where(valid))
+    return dates
+
+def passed_checks(checks, index):
+    """
+    Find the rows that have not failed any of the checks so far.
+    :param checks: (row mask, error message) pairs
+    :param index: the index of the rows being checked
+    :return: a boolean mask of the rows with no errors
+    """
+    passed = pd.Series(True, index=index)
+    for mask, _ in checks:
+        passed &= ~mask
+    return passed
 
-def main():
+def validate_chunk(df, rules, log, fail_fast=False, missing_columns=()):
+    """
+    Validate and clean one chunk of the CSV data.
+    :param df: the chunk, with columns renamed to match the JSON keys
+    :param rules:
+    :param log:
+    :param fail_fast: stop checking (and cleaning) a row at its first error
+    :param missing_columns: validated columns the file doesn't have; they read as blank
+    :return: the clean rows and the error rows (with an error_desc column)
+    """
+    # Add the missing columns as blanks for the checks; they are dropped again at the end
+    text_type = pd.ArrowDtype(pa.string())
+    blank = pd.Series('', index=df.index, dtype=text_type)
+    df = df.assign(**{name: blank for name in missing_columns})
+
+    # Log messages as (row index, check order, message), written in row order at the end
+    log_entries = []
+
+    # --- Pre-validation Checks ---
+    # Email is a unique ID. If it's missing, fail the whole row immediately.
+    email = df['email_add'].str.strip()
+    missing_email = email.eq('') & rules['email_add']['required']
+    # The chunk index keeps counting across chunks, so it gives the file row number
+    # (the USPCID reads as None when the file has no such column)
+    uspcids = [None] * missing_email.sum() if 'USPCID' in missing_columns else df.loc[missing_email, 'USPCID']
+    for i, uspcid in zip(df.index[missing_email], uspcids):
+        log_entries.append((i, 0, f"ERROR: Row {i + 1} with USPCID '{uspcid}' moved to error file due to missing email address."))
+
+    rows = df[~missing_email].copy()
+    email = email[~missing_email]
+
+    # Stable identifiers for logging, in case the row is malformed
+    log_ids = rows[['USPCID', 'USCLID']].assign(**{name: f'[MISSING {name}]' for name in ('USPCID', 'USCLID')
+                                                   if name in missing_columns})
+
+    # Each check is a (row mask, error message) pair, kept in reporting order
+    checks = []
+    # Rows still being checked. With fail_fast, rows that already failed drop out.
+    active = pd.Series(True, index=rows.index)
+
+    # --- Field-by-field validation ---
+
+    # 1. USPCID Validation
+    uspcid = rows['USPCID'].str.strip()
+    checks.append((uspcid.eq('') & rules['USPCID']['required'], "missing USPCID"))
+    checks.append((uspcid.ne('') & ~uspcid.str.isalnum(), "USPCID contains special characters"))
+    if fail_fast:
+        active = passed_checks(checks, rows.index)
+
+    # 2. USCLID Validation
+    usclid = rows['USCLID'].str.strip()
+    checks.append((active & usclid.eq('') & rules['USCLID']['required'], "missing USCLID"))
+    checks.append((active & usclid.ne('') & ~usclid.str.isalnum(), "USCLID contains special characters"))
+    if fail_fast:
+        active = passed_checks(checks, rows.index)
+
+    # 3. Email Validation (format), only for the emails that still need checking
+    check_email = active & email.ne('')
+    valid_email = email[check_email].str.fullmatch(_EMAIL_PATTERN).reindex(rows.index, fill_value=True).astype(bool)
+    checks.append((check_email & ~valid_email, "invalid email address"))
+    if fail_fast:
+        active = passed_checks(checks, rows.index)
+
+    # 4 Mobile Number Validation and Cleaning
+    original_mobile = rows['Mobile_no'].str.strip()
+    has_mobile = original_mobile.ne('')
+    # Remove country code prefixes
+    mobile = original_mobile.str.replace(_COUNTRY_CODE_PATTERN, '', regex=True).str.strip()
+
+    changed = active & mobile.ne(original_mobile)
+    for (i, uspcid, usclid), before, after in zip(log_ids[changed].itertuples(),
+                                                  original_mobile[changed], mobile[changed]):
+        log_entries.append((i, 1,
+                            f"INFO: USPCID '{uspcid}', USCLID '{usclid}' mobile_no changed from '{before}' to '{after}'."))
+    rows['Mobile_no'] = rows['Mobile_no'].mask(changed, mobile)
+
+    zero_mobile = active & has_mobile & mobile.eq('0')
+    bad_mobile = active & has_mobile & ~zero_mobile & ~(is_ascii_digits(mobile) & mobile.str.len().eq(7))
+    checks.append((bad_mobile, "invalid mobile number format: " + original_mobile))
+
+    first_digit = mobile.str[0]
+    valid_mobile = active & has_mobile & ~zero_mobile & ~bad_mobile
+    not_mobile = valid_mobile & first_digit.isin(_NON_MOBILE_PREFIXES)
+    out_of_range = valid_mobile & ~not_mobile & ~first_digit.isin(_MOBILE_PREFIXES)
+
+    for (i, uspcid, usclid) in log_ids[zero_mobile].itertuples():
+        log_entries.append((i, 2, f"WARNING: USPCID '{uspcid}', USCLID '{usclid}' has a mobile number of '0'."))
+    for (i, uspcid, usclid), number in zip(log_ids[not_mobile].itertuples(), mobile[not_mobile]):
+        log_entries.append((i, 2,
+                            f"WARNING: USPCID '{uspcid}', USCLID '{usclid}' number '{number}' is not a mobile number."))
+    for (i, uspcid, usclid), number in zip(log_ids[out_of_range].itertuples(), mobile[out_of_range]):
+        log_entries.append((i, 2,
+                            f"WARNING: USPCID '{uspcid}', USCLID '{usclid}' has a mobile number '{number}' outside expected ranges."))
+    for (i, uspcid, usclid) in log_ids[active & ~has_mobile].itertuples():
+        log_entries.append((i, 2, f"INFO: USPCID {uspcid} and USCLID {usclid} has No mobile number"))
+    if fail_fast:
+        active = passed_checks(checks, rows.index)
+
+    # 5 Account Number Validation and cleaning
+    # (disabled along with the commented-out 'AC_NO' mapping in main())
+    #original_acc_no = rows['Acc_no'].str.strip()
+    #has_acc_no = original_acc_no.ne('')
+    #digit_acc_no = has_acc_no & is_ascii_digits(original_acc_no)
+    #long_acc_no = digit_acc_no & original_acc_no.str.len().gt(10)
+    #checks.append((active & ~has_acc_no, "invalid account"))
+    #checks.append((active & has_acc_no & ~digit_acc_no, "invalid account number format"))
+    #checks.append((active & long_acc_no, "invalid account number length"))
+
+    # Valid account numbers, proceed with padding and formatting in one pass
+    #valid_acc_no = active & digit_acc_no & ~long_acc_no
+    #padded_acc_no = original_acc_no.str.pad(10, fillchar='0')
+    #padded = valid_acc_no & padded_acc_no.ne(original_acc_no)  # Log only if a change happened
+    #for (i, uspcid, usclid), before, after in zip(log_ids[padded].itertuples(),
+    #                                              original_acc_no[padded], padded_acc_no[padded]):
+    #    log_entries.append((i, 3,
+    #                        f"INFO: USPCID '{uspcid}', USCLID '{usclid}' Acc_no changed from '{before}' to '{after}'."))
+
+    # Format as an Excel formula to force text interpretation and preserve leading zeros
+    #rows['Acc_no'] = rows['Acc_no'].mask(valid_acc_no, '="' + padded_acc_no + '"')
+    #if fail_fast:
+    #    active = passed_checks(checks, rows.index)
+
+    # 6. Date of Birth (DOB) Validation and Formatting
+    original_dob = rows['DOB'].str.strip()
+    has_dob = original_dob.ne('')
+    checks.append((active & ~has_dob, "missing date of birth"))
+
+    # Parse the column at once (only the dates that still need checking)
+    check_dob = active & has_dob
+    dob = parse_dates(original_dob[check_dob]).reindex(rows.index)
+    parsed_dob = dob.notna()
+    checks.append((check_dob & ~parsed_dob, "invalid date of birth format: " + original_dob))
+
+    reformatted = parsed_dob & dob.ne(original_dob)
+    for (i, uspcid, usclid), before, after in zip(log_ids[reformatted].itertuples(),
+                                                  original_dob[reformatted], dob[reformatted]):
+        log_entries.append((i, 4, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' DOB changed from '{before}' to '{after}'."))
+    rows['DOB'] = rows['DOB'].mask(parsed_dob, dob)
+
+    # Each row's messages come out together, in the order its checks ran
+    for _, _, message in sorted(log_entries, key=lambda entry: entry[:2]):
+        log_message(log, message)
+
+    # Join the messages of every failed check, in check order (only the first with fail_fast)
+    error_desc = pd.Series('', index=rows.index, dtype=text_type)
+    for mask, message in checks:
+        error_desc = error_desc.mask(mask, error_desc + ',' + message)
+    error_desc = error_desc.str.lstrip(',')
+    failed = error_desc.ne('')
+
+    # --- Write to appropriate file ---
+    errors = pd.concat([
+        df[missing_email].assign(error_desc=pd.Series("missing email address", index=df.index[missing_email],
+                                                      dtype=text_type)),
+        rows[failed].assign(error_desc=error_desc[failed]),
+    ]).sort_index()
+    clean = rows[~failed]
+
+    return clean.drop(columns=list(missing_columns)), errors.drop(columns=list(missing_columns))
+
+def ragged_rows_frame(rows, columns):
+    """
+    Build a chunk from rows Arrow rejected for having the wrong number of fields.
+    Short rows are padded with blanks and long rows trimmed to the header width,
+    the same way the csv.reader version of this script read them.
+    :param rows: (row position in the file, raw CSV text) pairs
+    :param columns:
+    :return: a DataFrame of the rows, indexed by their position in the file
+    """
+    width = len(columns)
+    values = [(next(csv.reader([text]), []) + [''] * width)[:width] for _, text in rows]
+    return pd.DataFrame(values, columns=columns, index=[position for position, _ in rows],
+                        dtype=pd.ArrowDtype(pa.string()))
+
+def read_chunks(input_csv_file, header, processed_header):
+    """
+    Stream the CSV file through Arrow's CSV reader one block at a time, so memory stays flat
+    however large the input is. Every field is read as text so nothing is reinterpreted
+    (leading zeros, blanks). Columns are named from the header as csv.reader read it, so
+    a UTF-8 BOM stays part of the first name. Like csv.reader, blank lines are kept as
+    rows and quoted fields may contain newlines (blocks are then only cut between whole
+    records).
+    :param input_csv_file:
+    :param header: the header row, as csv.reader read it
+    :param processed_header: the column names used for validation
+    :return: the chunks, in file order, indexed by row position in the file
+    """
+    # Arrow can't parse rows with the wrong number of fields, so it hands them to this
+    # handler instead; they are padded/trimmed and put back in place further down
+    reported_rows = []
+    def set_aside_ragged_row(invalid_row):
+        # Row numbers count the header as row 1
+        reported_rows.append((invalid_row.number - 2, invalid_row.text))
+        return 'skip'
+
+    with pacsv.open_csv(input_csv_file,
+                        read_options=pacsv.ReadOptions(block_size=_READ_BLOCK_SIZE,
+                                                       column_names=header, skip_rows=1),
+                        parse_options=pacsv.ParseOptions(invalid_row_handler=set_aside_ragged_row,
+                                                         ignore_empty_lines=False,
+                                                         newlines_in_values=True),
+                        convert_options=pacsv.ConvertOptions(column_types={h: pa.string() for h in header})
+                        ) as reader:
+        # Ragged rows reported but not yet put back, as (row position, text), sorted
+        pending_rows = []
+        # File position of the next row Arrow returns
+        next_position = 0
+        for batch in reader:
+            # Arrow-backed string columns keep the .str operations in Arrow kernels
+            chunk = batch.to_pandas(types_mapper=pd.ArrowDtype)
+            chunk.columns = processed_header
+
+            # The handler may already be reporting rows of the next block, so only take
+            # what has been reported so far (slicing/deleting the list is atomic)
+            reported = reported_rows[:]
+            del reported_rows[:len(reported)]
+            pending_rows = sorted(pending_rows + reported)
+
+            # Number the rows by their position in the file: Arrow's rows fill the
+            # positions not taken by the ragged rows
+            ragged_positions = [position for position, _ in pending_rows]
+            positions = np.arange(next_position, next_position + len(chunk) + len(ragged_positions))
+            chunk.index = positions[~np.isin(positions, ragged_positions)][:len(chunk)]
+            if len(chunk):
+                next_position = chunk.index[-1] + 1
+
+            # Ragged rows that fall inside this block are validated with it
+            placed = [row for row in pending_rows if row[0] < next_position]
+            if placed:
+                del pending_rows[:len(placed)]
+                chunk = pd.concat([chunk, ragged_rows_frame(placed, processed_header)]).sort_index()
+
+            yield chunk
+
+    # Ragged rows at the very end of the file
+    pending_rows = sorted(pending_rows + reported_rows)
+    if pending_rows:
+        yield ragged_rows_frame(pending_rows, processed_header)
+
+def main(fail_fast=False):
     """
     Main function to validate the CSV data
+    :param fail_fast: move a row to the error file at its first error, skipping the remaining checks
     :return:
     """
     try:
@@ -41,161 +356,50 @@ def main():
     job_log_file = 'job_log.txt'
 
     try:
-        with open(input_csv_file,'r',newline='') as infile, \
-             open(clean_data_csv,'w',newline='') as clean_file, \
-             open(error_data_csv,'w',newline='') as error_file, \
-             open(job_log_file,'w') as log:
-
-            reader = csv.reader(infile)
-            clean_writer = csv.writer(clean_file)
-            error_writer = csv.writer(error_file)
-
-            header = next(reader)
-            # Rename columns to match JSON keys
-            header_map = {
-                'Mobile_No': 'Mobile_no'
-                #'AC_NO': 'Acc_no'
-            }
-            processed_header = [header_map.get(h, h) for h in header]
-
-            clean_writer.writerow(header)
-            error_header = header + ['error_desc']
-            error_writer.writerow(error_header)
+        with open(input_csv_file,'r',newline='') as infile:
+            header = next(csv.reader(infile))
+            # Anything after the header? (Arrow can't skip the header of a file that ends there)
+            has_rows = infile.read(1) != ''
+        # Rename columns to match JSON keys
+        header_map = {
+            'Mobile_No': 'Mobile_no'
+            #'AC_NO': 'Acc_no'
+        }
+        processed_header = [header_map.get(h, h) for h in header]
+        # Validated columns missing from the header (read as blank by validate_chunk).
+        # Acc_no is only validated once its mapping above is enabled.
+        validated_columns = ['USPCID', 'USCLID', 'email_add', 'Mobile_no', 'DOB']
+        if 'Acc_no' in header_map.values():
+            validated_columns.append('Acc_no')
+        missing_columns = [name for name in validated_columns if name not in processed_header]
+
+        with open(clean_data_csv,'w',newline='',buffering=_OUTPUT_BUFFER_SIZE) as clean_file, \
+             open(error_data_csv,'w',newline='',buffering=_OUTPUT_BUFFER_SIZE) as error_file, \
+             open(job_log_file,'w',buffering=_OUTPUT_BUFFER_SIZE) as log:
+
+            csv.writer(clean_file).writerow(header)
+            csv.writer(error_file).writerow(header + ['error_desc'])
 
             log_message(log, "Job Started: Data Validation")
 
-            for i, row in enumerate(reader,1):
-                # Create a dictionary from the row
-                try:
-                    row_data = dict(zip(processed_header, row))
-                except IndexError:
-                    log_message(log, f"ERROR: Row{i} has incorrect number of columns. Skipping")
-                    continue
-
-                # --- Pre-validation Checks ---
-                # Email is a unique ID. If it's missing, fail the whole row immediately.
-                email = row_data.get('email_add', '').strip()
-                if rules['email_add']['required'] and not email:
-                    original_row_values = [row_data.get(h, '') for h in processed_header]
-                    error_writer.writerow(original_row_values + ["missing email address"])
-                    log_message(log, f"ERROR: Row {i} with USPCID '{row_data.get('USPCID')}' moved to error file due to missing email address.")
-                    continue
-
-                # Define stable identifiers for logging, in case the row is malformed
-                log_uspcid = row_data.get('USPCID', '[MISSING USPCID]')
-                log_usclid = row_data.get('USCLID', '[MISSING USCLID]')
-
-                error_description = []
-
-                # --- Field-by-field validation ---
-
-                # 1. USPCID Validation
-                uspcid = row_data.get('USPCID', '').strip()
-                if rules['USPCID']['required'] and not uspcid:
-                    error_description.append("missing USPCID")
-                elif uspcid and not uspcid.isalnum():
-                    error_description.append("USPCID contains special characters")
-
-                # 2. USCLID Validation
-                usclid = row_data.get('USCLID', '').strip()
-                if rules['USCLID']['required'] and not usclid:
-                    error_description.append("missing USCLID")
-                elif usclid and not usclid.isalnum():
-                    error_description.append("USCLID contains special characters")
-
-                # 3. Email Validation (format)
-                if email and not validate_email(email):
-                    error_description.append("invalid email address")
-
-                # 4 Mobile Number Validation and Cleaning
-                mobile = row_data.get('Mobile_no', '').strip()
-                original_mobile = mobile
-                if mobile:
-                    # Remove country code prefixes
-                    if mobile.startswith('+685'):
-                        mobile = mobile[4:].strip()
-                    elif mobile.startswith('685'):
-                        mobile = mobile[3:].strip()
-
-                    if mobile != original_mobile:
-                        log_message(log,
-                                    f"INFO: USPCID '{log_uspcid}', USCLID '{log_usclid}' mobile_no changed from '{original_mobile}' to '{mobile}'.")
-                        row_data['Mobile_no'] = mobile
-
-                    if mobile == '0':
-                        log_message(log, f"WARNING: USPCID '{log_uspcid}', USCLID '{log_usclid}' has a mobile number of '0'.")
-                    elif not mobile.isdigit() or len(mobile) != 7:
-                        error_description.append(f"invalid mobile number format: {original_mobile}")
-                    else:
-                        first_digit = mobile[0]
-                        if first_digit in ['2', '3', '4','5','6','800']:
-                            log_message(log,
-                                        f"WARNING: USPCID '{log_uspcid}', USCLID '{log_usclid}' number '{mobile}' is not a mobile number.")
-                        elif first_digit not in ['9', '3']:
-                            log_message(log,
-                                        f"WARNING: USPCID '{log_uspcid}', USCLID '{log_usclid}' has a mobile number '{mobile}' outside expected ranges.")
-                else:
-                    log_message(log, f"INFO: USPCID {log_uspcid} and USCLID {log_usclid} has No mobile number")
-
-                # 5 Account Number Validation and cleaning
-                #acc_no = row_data.get('Acc_no', '').strip()
-                #original_acc_no = acc_no
-
-                #if not acc_no:
-                #    error_description.append("invalid account")
-                #elif not acc_no.isdigit():
-                #    error_description.append("invalid account number format")
-                #elif len(acc_no) > 10:
-                #    error_description.append("invalid account number length")
-                #else:
-                    # This is a valid account number, proceed with padding and formatting
-                #    padded_acc_no = acc_no.zfill(10)
-                #    if padded_acc_no != acc_no:  # Log only if a change happened
-                #       log_message(log,
-                #                    f"INFO: USPCID '{log_uspcid}', USCLID '{log_usclid}' Acc_no changed from '{original_acc_no}' to '{padded_acc_no}'.")
-
-                    # Format as an Excel formula to force text interpretation and preserve leading zeros
-                #    row_data['Acc_no'] = f'="{padded_acc_no}"'
-
-                # 6. Date of Birth (DOB) Validation and Formatting
-                dob_str = row_data.get('DOB', '').strip()
-                original_dob_str = dob_str
-                if not dob_str:
-                    error_description.append("missing date of birth")
-                else:
-                    dob_obj = None
-                    # Try parsing different date formats, including with 2-digit year
-                    for fmt in ['%d/%m/%Y', '%d/%m/%y']:
-                        try:
-                            dob_obj = datetime.strptime(dob_str, fmt)
-                            break
-                        except ValueError:
-                            pass
-
-                    if dob_obj:
-                        formatted_dob = dob_obj.strftime('%d/%m/%Y')
-                        if formatted_dob != original_dob_str:
-                            log_message(log, f"INFO: USPCID '{log_uspcid}', USCLID '{log_usclid}' DOB changed from '{original_dob_str}' to '{formatted_dob}'.")
-                        row_data['DOB'] = formatted_dob
-                    else:
-                        error_description.append(f"invalid date of birth format: {original_dob_str}")
-
-                # --- Write to appropriate file ---
-                if error_description:
-                    # Ensure the row has the same number of columns as the original header
-                    original_row_values = [row_data.get(h,'') for h in processed_header]
-                    error_writer.writerow(original_row_values + [",".join(error_description)])
-                else:
-                    # Write the cleaned row back in the original header
-                    clean_row = [row_data.get(h,'') for h in processed_header]
-                    clean_writer.writerow(clean_row)
+            if has_rows:
+                for chunk in read_chunks(input_csv_file, header, processed_header):
+                    clean, errors = validate_chunk(chunk, rules, log, fail_fast, missing_columns)
+                    # Write the rows back in the original header
+                    clean.to_csv(clean_file, header=False, index=False, lineterminator='\r\n')
+                    errors.to_csv(error_file, header=False, index=False, lineterminator='\r\n')
 
             log_message(log, "Job Finished.")
 
+            # Flush the buffered outputs and make sure they reach the disk before closing
+            for output_file in (clean_file, error_file, log):
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
     except FileNotFoundError:
         print(f"Error: Input file '{input_csv_file}' not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,8 +1,27 @@
 import csv
 import json
+import os
 import re
+import string
+import time
 from datetime import datetime
 from importlib.metadata import requires
+from typing import TextIO
+
+# Characters allowed either side of the '@' (same classes as the old email regex)
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '_.+-')
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '-.')
+
+# Cook Islands country code, with or without the leading '+'
+_COUNTRY_CODE_RE = re.compile(r'\A\+?682')
+# First digits of Cook Islands non-mobile numbers, and of mobile numbers (checked in that order)
+_NON_MOBILE_PREFIXES = frozenset('234')
+_MOBILE_PREFIXES = frozenset('578')
+
+# Rows are collected and handed to writerows in batches of this size
+_WRITE_BATCH_SIZE = 4096
+# Output files use a 1 MiB buffer so many rows/log lines share one write()
+_OUTPUT_BUFFER_SIZE = 1 << 20
 
 
 def validate_email(email):
@@ -11,22 +30,151 @@ def validate_email(email):
     :param email:
     :return:
     """
-    regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return re.match(regex,email)
+    at = email.find('@')
+    if at <= 0:
+        return False
+    local, domain = email[:at], email[at + 1:]
+    # The domain needs a label before its first dot and something after it
+    dot = domain.find('.')
+    if dot <= 0 or dot == len(domain) - 1:
+        return False
+    return _EMAIL_LOCAL_CHARS.issuperset(local) and _EMAIL_DOMAIN_CHARS.issuperset(domain)
+
+# Last formatted log timestamp, as [epoch second, text]
+_log_timestamp = [None, '']
 
 def log_message(log_file, message):
     """
     Write a message to the job log file.
+    The timestamp only has second resolution, so it is formatted once per second.
     :param log_file:
     :param message:
     :return:
     """
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_file.write(f"[{timestamp}] {message}\n")
+    second = int(time.time())
+    if second != _log_timestamp[0]:
+        _log_timestamp[:] = [second, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))]
+    log_file.write(f"[{_log_timestamp[1]}] {message}\n")
+
+def is_ascii_digits(value: str) -> bool:
+    """
+    Check that a value is made only of the ASCII digits 0-9.
+    str.isdigit alone also accepts other Unicode digits (e.g. '١').
+    :param value:
+    :return:
+    """
+    return value.isascii() and value.isdigit()
+
+def validate_row(row: list[str], idx: dict[str, int], rules: dict, log_file: TextIO,
+                 fail_fast: bool = False) -> tuple[list[str], list[str]]:
+    """
+    Validate and clean a single CSV row in place.
+    :param row: the row values, padded to the header width
+    :param idx: the position of each column name in the row
+    :param rules: the validation rules loaded from validation_rules.json
+    :param log_file:
+    :param fail_fast: return at the first error, skipping the remaining checks and cleaning
+    :return: the cleaned row and the list of error descriptions
+    """
+    error_description = []
+
+    # --- Field-by-field validation ---
+
+    # 1. USPCID Validation
+    uspcid = row[idx['USPCID']].strip()
+    if rules['USCLID']['required'] and not uspcid:
+        error_description.append("missing USPCID")
+
+    if fail_fast and error_description:
+        return row, error_description
+
+    # 2. USCLID  Validation
+    usclid = row[idx['USPCID']].strip()
+    if rules['USCLID']['required'] and not usclid:
+        error_description.append("missing USCLID")
+
+    if fail_fast and error_description:
+        return row, error_description
+
+    # 3. Email Validation
+    email = row[idx['email_add']].strip()
+    if rules['email_add']['required'] and not email:
+        error_description.append("missing email address")
+    elif email and not validate_email(email):
+        error_description.append("invalid email address")
 
-def main():
+    if fail_fast and error_description:
+        return row, error_description
+
+    # 4 Mobile Number Validation and Cleaning
+    mobile = row[idx['Mobile_no']].strip()
+    original_mobile = mobile
+    if mobile:
+        # Remove country code prefixes
+        mobile = _COUNTRY_CODE_RE.sub('', mobile).strip()
+
+        if mobile != original_mobile:
+            log_message(log_file, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' mobile_no changed from '{original_mobile}' to '{mobile}'.")
+            row[idx['Mobile_no']] = mobile
+
+        if not is_ascii_digits(mobile) or len(mobile) != 5:
+            error_description.append(f"invalid mobile number format: {original_mobile}")
+        else:
+            first_digit = mobile[0]
+            if first_digit in _NON_MOBILE_PREFIXES:
+                log_message(log_file, F"WARNING: USPCID '{uspcid}',USCLID '{usclid}' number '{mobile} is not a mobile number.'")
+            elif first_digit not in _MOBILE_PREFIXES:
+                log_message(log_file, f"WARNING USPCID '{uspcid}' , USCLID '{usclid}' ,has a mobile number '{mobile}' outside expected ranges.")
+    else:
+        log_message(log_file, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' has no mobile number.")
+
+    if fail_fast and error_description:
+        return row, error_description
+
+    # 5 Account Number Validation and cleaning
+    acc_no = row[idx['Acc_no']].strip()
+    original_acc_no = acc_no
+
+    if not acc_no:
+        error_description.append("invalid account")
+    elif not is_ascii_digits(acc_no):
+        error_description.append("invalid account number format")
+    elif len(acc_no) > 10:
+        error_description.append("invalid account number length")
+    else:
+        if len(acc_no) < 10:
+            acc_no = acc_no.zfill(10)
+            row[idx['Acc_no']] = acc_no
+            log_message(log_file, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' Acc_no changed from '{original_acc_no}' to '{acc_no}'.")
+
+    if fail_fast and error_description:
+        return row, error_description
+
+    # 6 Date of Birth (DOB) validation and formatting
+    dob_str = row[idx['DOB']].strip()
+    if rules['DOB']['required'] and not dob_str:
+        error_description.append("invalid date of birth")
+    elif dob_str:
+        try:
+            # Attempt to parse and reforamt to ensure correctness
+            dob_obj = datetime.strptime(dob_str,'%d/%m/%Y')
+            row[idx['DOB']] = dob_obj.strftime('%d/%m/%Y')
+        except ValueError:
+            # Simple attempt tp fix common issues, like wring separators
+            try:
+                corrected_dob = dob_str.replace('-','/').replace('.','/')
+                dob_obj = datetime.strptime(corrected_dob,'%d/%m/%Y')
+                row[idx['DOB']] = dob_obj.strftime('%d/%m/%Y')
+                log_message(log_file, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' DOB '{dob_str}' was corrected to ' {row[idx['DOB']]}'.")
+            except ValueError:
+                error_description.append("invalid date of birth")
+
+    return row, error_description
+
+def main(fail_fast=False):
     """
     Main function to validate the CSV data
+    :param fail_fast: move a row to the error file at its first error, skipping the remaining checks
     :return:
     """
     try:
@@ -43,9 +191,9 @@ def main():
 
     try:
         with open(input_csv_file,'r',newline='') as infile, \
-             open(clean_data_csv,'w',newline='') as clean_file, \
-             open(error_data_csv,'w',newline='') as error_file, \
-             open(job_log_file,'w') as log:
+             open(clean_data_csv,'w',newline='',buffering=_OUTPUT_BUFFER_SIZE) as clean_file, \
+             open(error_data_csv,'w',newline='',buffering=_OUTPUT_BUFFER_SIZE) as error_file, \
+             open(job_log_file,'w',buffering=_OUTPUT_BUFFER_SIZE) as log:
 
             reader = csv.reader(infile)
             clean_writer = csv.writer(clean_file)
@@ -58,6 +206,17 @@ def main():
                 'AC_NO': 'Acc_no'
             }
             processed_header = [header_map.get(h, h) for h in header]
+            header_len = len(processed_header)
+
+            # Field positions are fixed, so resolve them once instead of building a dict per row.
+            # A validated column missing from the header gets a spare blank field past the end
+            # of the row, so it reads as blank; spare fields are dropped before writing.
+            idx = {name: i for i, name in enumerate(processed_header)}
+            missing_columns = [name for name in ('USPCID', 'email_add', 'Mobile_no', 'Acc_no', 'DOB') if name not in idx]
+            for i, name in enumerate(missing_columns, header_len):
+                idx[name] = i
+            # Blank fields for padding short rows (and the spare fields), built once
+            padding = [''] * (header_len + len(missing_columns))
 
             clean_writer.writerow(header)
             error_header = header + ['error_desc']
@@ -65,108 +224,45 @@ def main():
 
             log_message(log, "Job Started: Data Validation")
 
+            clean_batch = []
+            error_batch = []
+
             for i, row in enumerate(reader,1):
-                # Create a dictionary from the row
-                try:
-                    row_data = dict(zip(processed_header, row))
-                except IndexError:
-                    log_message(log, f"ERROR: Row{i} has incorrect number of columns. Skipping")
-                    continue
-
-                error_description = []
-
-                # --- Field-by-field validation ---
-
-                # 1. USPCID Validation
-                uspcid = row_data.get('USPCID','').strip()
-                if rules['USCLID']['required'] and not uspcid:
-                    error_description.append("missing USPCID")
-
-                # 2. USCLID  Validation
-                usclid = row_data.get('USPCID', '').strip()
-                if rules['USCLID']['required'] and not usclid:
-                    error_description.append("missing USCLID")
-
-                # 3. Email Validation
-                email = row_data.get('email_add', '').strip()
-                if rules['email_add']['required'] and not email:
-                    error_description.append("missing email address")
-                elif email and not validate_email(email):
-                    error_description.append("invalid email address")
-
-                # 4 Mobile Number Validation and Cleaning
-                mobile = row_data.get('Mobile_no', '').strip()
-                original_mobile = mobile
-                if mobile:
-                    # Remove country code prefixes
-                    if mobile.startswith('+682'):
-                        mobile = mobile[4:].strip()
-                    elif mobile.startswith('682'):
-                        mobile = mobile[3:].strip()
-
-                    if mobile != original_mobile:
-                        log_message(log, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' mobile_no changed from '{original_mobile}' to '{mobile}'.")
-                        row_data['Mobile_no'] = mobile
-
-                    if not mobile.isdigit() or len(mobile) != 5:
-                        error_description.append(f"invalid mobile number format: {original_mobile}")
-                    else:
-                        first_digit = mobile[0]
-                        if first_digit in ['2','3','4']:
-                            log_message(log, F"WARNING: USPCID '{uspcid}',USCLID '{usclid}' number '{mobile} is not a mobile number.'")
-                        elif first_digit not in ['5','7','8']:
-                            log_message(log, f"WARNING USPCID '{uspcid}' , USCLID '{usclid}' ,has a mobile number '{mobile}' outside expected ranges.")
-                else:
-                    log_message(log, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' has no mobile number.")
-
-                # 5 Account Number Validation and cleaning
-                acc_no = row_data.get('Acc_no', '').strip()
-                original_acc_no = acc_no
-
-                if not acc_no:
-                    error_description.append("invalid account")
-                elif not acc_no.isdigit():
-                    error_description.append("invalid account number format")
-                elif len(acc_no) > 10:
-                    error_description.append("invalid account number length")
-                else:
-                    if len(acc_no) < 10:
-                        acc_no = acc_no.zfill(10)
-                        row_data['Acc_no'] = acc_no
-                        log_message(log, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' Acc_no changed from '{original_acc_no}' to '{acc_no}'.")
-
-                # 6 Date of Birth (DOB) validation and formatting
-                dob_str = row_data.get('DOB', '').strip()
-                if rules['DOB']['required'] and not dob_str:
-                    error_description.append("invalid date of birth")
-                elif dob_str:
-                    try:
-                        # Attempt to parse and reforamt to ensure correctness
-                        dob_obj = datetime.strptime(dob_str,'%d/%m/%Y')
-                        row_data['DOB'] = dob_obj.strftime('%d/%m/%Y')
-                    except ValueError:
-                        # Simple attempt tp fix common issues, like wring separators
-                        try:
-                            corrected_dob = dob_str.replace('-','/').replace('.','/')
-                            dob_obj = datetime.strptime(corrected_dob,'%d/%m/%Y')
-                            row_data['DOB'] = dob_obj.strftime('%d/%m/%Y')
-                            log_message(log, f"INFO: USPCID '{uspcid}', USCLID '{usclid}' DOB '{dob_str}' was corrected to ' {row_data['DOB']}'.")
-                        except ValueError:
-                            error_description.append("invalid date of birth")
+                # Trim long rows and pad short ones in place so every field position exists.
+                # Each row is a new list from csv.reader, so it can be cleaned and batched
+                # without copying (a shared row buffer would be overwritten while still batched).
+                if len(row) > header_len:
+                    del row[header_len:]
+                row.extend(padding[len(row):])
+
+                row, error_description = validate_row(row, idx, rules, log, fail_fast)
+                # Drop any spare fields so the row matches the original header again
+                del row[header_len:]
 
                 # --- Write to appropriate file ---
+                # The row already has the same number of columns as the original header
                 if error_description:
-                    error_row = list(row_data.values())
-                    # Ensure the row has the same number of columns as the original header
-                    original_row_values = [row_data.get(h,'') for h in processed_header]
-                    error_writer.writerow(original_row_values + [",".join(error_description)])
+                    row.append(",".join(error_description))
+                    error_batch.append(row)
                 else:
-                    # Write the cleaned row back in the original header
-                    clean_row = [row_data.get(h,'') for h in processed_header]
-                    clean_writer.writerow(clean_row)
+                    clean_batch.append(row)
+
+                if len(clean_batch) + len(error_batch) >= _WRITE_BATCH_SIZE:
+                    clean_writer.writerows(clean_batch)
+                    error_writer.writerows(error_batch)
+                    clean_batch.clear()
+                    error_batch.clear()
+
+            clean_writer.writerows(clean_batch)
+            error_writer.writerows(error_batch)
 
             log_message(log, "Job Finished.")
 
+            # Flush the buffered outputs and make sure they reach the disk before closing
+            for output_file in (clean_file, error_file, log):
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
     except FileNotFoundError:
         print(f"Error: Input file '{input_csv_file}' not found.")
     except Exception as e: